@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import os
 from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
 from dotenv import load_dotenv
-from pydantic import BaseSettings, Field
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Load environment variables from a .env file if present (local dev only)
-load_dotenv()
+# Load environment variables from a .env file if present (local dev only).
+# Production images set ENV=production and take config from the platform.
+if os.getenv("ENV") != "production":
+    load_dotenv()
 
 
 class Settings(BaseSettings):
@@ -18,47 +22,48 @@ class Settings(BaseSettings):
     project_id: Optional[str] = Field(default=None, description="GCP project ID")
 
     # OpenAI
-    openai_api_key: str = Field(..., env="OPENAI_API_KEY")
-    openai_model: str = Field("gpt-4o", env="OPENAI_MODEL")
+    openai_api_key: str = Field(..., validation_alias="OPENAI_API_KEY")
+    openai_model: str = Field("gpt-4o", validation_alias="OPENAI_MODEL")
 
     # WhatsApp / Meta Cloud API
-    whatsapp_token: str = Field(..., env="WHATSAPP_TOKEN")
-    whatsapp_phone_id: str = Field(..., env="WHATSAPP_PHONE_ID")
-    whatsapp_api_version: str = Field("v19.0", env="WHATSAPP_API_VERSION")
-    whatsapp_app_secret: str = Field(..., env="WHATSAPP_APP_SECRET")
-    whatsapp_verify_token: str = Field(..., env="WHATSAPP_VERIFY_TOKEN")
-    primary_user_phone: str = Field(..., env="PRIMARY_USER_PHONE")
+    whatsapp_token: str = Field(..., validation_alias="WHATSAPP_TOKEN")
+    whatsapp_phone_id: str = Field(..., validation_alias="WHATSAPP_PHONE_ID")
+    whatsapp_api_version: str = Field("v19.0", validation_alias="WHATSAPP_API_VERSION")
+    whatsapp_app_secret: str = Field(..., validation_alias="WHATSAPP_APP_SECRET")
+    whatsapp_verify_token: str = Field(..., validation_alias="WHATSAPP_VERIFY_TOKEN")
+    primary_user_phone: str = Field(..., validation_alias="PRIMARY_USER_PHONE")
 
     # Firebase
     firebase_credentials_json: Optional[str] = Field(
         default=None,
-        env="GOOGLE_APPLICATION_CREDENTIALS",
+        validation_alias="GOOGLE_APPLICATION_CREDENTIALS",
         description="Path to service-account JSON file or JSON string itself.",
     )
 
+    trust_db_reads: bool = Field(True, validation_alias="TRUST_DB_READS", description="If true, messages read back from Firebase are not re-validated when returned as dicts.")
+
     # Cloud Storage
-    bucket_name: str = Field("dietbot-images", env="BUCKET_NAME")
+    bucket_name: str = Field("dietbot-images", validation_alias="BUCKET_NAME")
 
     # Image processing / storage
-    image_max_dim: int = Field(1024, env="IMAGE_MAX_DIM", description="Maximum width or height for uploaded images (pixels).")
-    image_quality: int = Field(85, env="IMAGE_QUALITY", description="JPEG/PNG quality for compressed uploads (1-100).")
-    public_images: bool = Field(False, env="PUBLIC_IMAGES", description="If true, uploaded images are made public instead of using signed URLs.")
+    image_max_dim: int = Field(1024, validation_alias="IMAGE_MAX_DIM", description="Maximum width or height for uploaded images (pixels).")
+    image_quality: int = Field(85, validation_alias="IMAGE_QUALITY", description="JPEG/PNG quality for compressed uploads (1-100).")
+    image_passthrough_max_bytes: int = Field(1024 * 1024, validation_alias="IMAGE_PASSTHROUGH_MAX_BYTES", description="JPEG/WebP uploads within IMAGE_MAX_DIM and at most this size are stored without re-encoding.")
+    public_images: bool = Field(False, validation_alias="PUBLIC_IMAGES", description="If true, uploaded images are made public instead of using signed URLs.")
 
     # Scheduler security
-    scheduler_token: str = Field(..., env="SCHEDULER_TOKEN")
+    scheduler_token: str = Field(..., validation_alias="SCHEDULER_TOKEN")
 
     # Defaults
     timezone_default: int = Field(0, description="Default UTC offset, e.g., 0 for UTC.")
 
     # LLM provider selection & OpenAI params
-    llm_provider: str = Field("openai", env="LLM_PROVIDER")
-    openai_temperature: float = Field(0.3, env="OPENAI_TEMPERATURE")
-    openai_top_p: float = Field(1.0, env="OPENAI_TOP_P")
-    openai_max_tokens: int = Field(1024, env="OPENAI_MAX_TOKENS")
-
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    llm_provider: str = Field("openai", validation_alias="LLM_PROVIDER")
+    openai_temperature: float = Field(0.3, validation_alias="OPENAI_TEMPERATURE")
+    openai_top_p: float = Field(1.0, validation_alias="OPENAI_TOP_P")
+    openai_max_tokens: int = Field(1024, validation_alias="OPENAI_MAX_TOKENS")
+
+    model_config = SettingsConfigDict(case_sensitive=False, extra="ignore")
 
 
 @lru_cache()
@@ -1,26 +1,36 @@
 """Webhook handler for Meta WhatsApp Cloud API."""
 from __future__ import annotations
 
+import asyncio
 import hmac
 import hashlib
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any
 
+import orjson
 from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, Request
 
 from app.config import get_settings
 from app.services.whatsapp import whatsapp_client
-from app.services.firebase_db import firebase_db
+from app.services.firebase_db import firebase_db_async
 from app.services.storage import storage_service
-from app.models import Message, ImageData
-from app.services.agent import AgentRunner
+from app.models import Message
 
 router = APIRouter()
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+_APP_SECRET = settings.whatsapp_app_secret.encode()
+_VERIFY_TOKEN = settings.whatsapp_verify_token
+_PRIMARY_PHONE = settings.primary_user_phone
+
+# hashlib falls back to its bundled (non-accelerated) SHA-256 when the OpenSSL
+# backend is unavailable; surface that at startup rather than silently.
+if hashlib.sha256.__name__ != "openssl_sha256":  # pragma: no cover
+    logger.warning("hashlib is not using OpenSSL; webhook HMAC will be slower.")
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -29,16 +39,17 @@ logger = logging.getLogger(__name__)
 def verify_signature(body: bytes, signature_header: str | None) -> None:
     if signature_header is None:
         raise HTTPException(status_code=403, detail="Missing signature header")
-    expected = hmac.new(
-        key=settings.whatsapp_app_secret.encode(),
-        msg=body,
-        digestmod=hashlib.sha256,
-    ).hexdigest()
+    if not signature_header.startswith("sha256="):
+        raise HTTPException(status_code=403, detail="Bad signature header")
+    received = signature_header[7:]
+    if len(received) != 64:
+        raise HTTPException(status_code=403, detail="Invalid signature")
     try:
-        algo, received = signature_header.split("=", 1)
+        received_digest = bytes.fromhex(received)
     except ValueError as exc:
-        raise HTTPException(status_code=403, detail="Bad signature header") from exc
-    if algo != "sha256" or not hmac.compare_digest(expected, received):
+        raise HTTPException(status_code=403, detail="Invalid signature") from exc
+    expected = hmac.digest(_APP_SECRET, body, "sha256")
+    if not hmac.compare_digest(expected, received_digest):
         raise HTTPException(status_code=403, detail="Invalid signature")
 
 
@@ -50,7 +61,7 @@ def verify_signature(body: bytes, signature_header: str | None) -> None:
 @router.get("/webhook")
 async def verify_webhook(mode: str, challenge: str, verify_token: str):  # noqa: D401
     """Meta webhook verification endpoint."""
-    if mode == "subscribe" and verify_token == settings.whatsapp_verify_token:
+    if mode == "subscribe" and verify_token == _VERIFY_TOKEN:
         return int(challenge)
     raise HTTPException(status_code=403, detail="Verification failed")
 
@@ -69,7 +80,11 @@ async def receive_webhook(
     raw_body = await request.body()
     verify_signature(raw_body, x_hub_signature_256)
 
-    payload = await request.json()
+    try:
+        payload = orjson.loads(raw_body)
+    except orjson.JSONDecodeError as exc:
+        logger.error("Invalid JSON in webhook body: %s", exc)
+        raise HTTPException(status_code=400, detail="Bad payload") from exc
     logger.debug("Webhook payload: %s", payload)
 
     # Extract message info
@@ -84,18 +99,18 @@ async def receive_webhook(
         logger.error("Malformed webhook payload: %s", exc)
         raise HTTPException(status_code=400, detail="Bad payload")
 
-    if from_phone != settings.primary_user_phone:
+    if from_phone != _PRIMARY_PHONE:
         logger.warning("Unknown sender: %s", from_phone)
         return {"status": "ignored"}
 
     user_id = "primary"
     message_id = msg.get("id", "")
-    timestamp = datetime.utcnow()
+    timestamp = datetime.now(timezone.utc)
 
     # Handle message types
     if msg["type"] == "text":
         text_body = msg["text"]["body"]
-        m = Message(
+        m = Message.model_construct(
             id=message_id,
             user_id=user_id,
             timestamp=timestamp,
@@ -103,14 +118,26 @@ async def receive_webhook(
             type="text",
             content=text_body,
         )
-        firebase_db.add_message(user_id, m)
+        await firebase_db_async.add_message(user_id, m)
         background_tasks.add_task(run_agent, user_id, text_body)
     elif msg["type"] == "image":
+        # Meta retries slow deliveries, so acknowledge first and fetch later.
         media_id = msg["image"]["id"]
+        background_tasks.add_task(_process_image_message, user_id, message_id, media_id, timestamp)
+    else:
+        logger.info("Unsupported message type: %s", msg["type"])
+
+    return {"status": "received"}
+
+
+async def _process_image_message(user_id: str, message_id: str, media_id: str, timestamp: datetime) -> None:
+    """Download, store and record an inbound image, then hand it to the agent."""
+    try:
         media_bytes, content_type = await whatsapp_client.download_media(media_id)
-        gs_path, url = storage_service.upload_image(media_bytes, user_id, message_id, content_type=content_type)
-        img_data = ImageData(width=0, height=0, mime_type=content_type, url=url)
-        m = Message(
+        gs_path, url, img_data = await storage_service.upload_image_async(
+            media_bytes, user_id, message_id, content_type=content_type
+        )
+        m = Message.model_construct(
             id=message_id,
             user_id=user_id,
             timestamp=timestamp,
@@ -120,16 +147,19 @@ async def receive_webhook(
             gcs_path=gs_path,
             image_data=img_data,
         )
-        firebase_db.add_message(user_id, m)
-        background_tasks.add_task(run_agent, user_id, url)
-    else:
-        logger.info("Unsupported message type: %s", msg["type"])
+        await firebase_db_async.add_message(user_id, m)
+    except Exception as exc:  # pragma: no cover
+        logger.exception("Image message processing failed: %s", exc)
+        return
+    await run_agent(user_id, url)
 
-    return {"status": "received"}
 
+async def run_agent(user_id: str, incoming: str) -> None:
+    # Deferred: the agent pulls in the LLM client, which the webhook path never needs
+    from app.services.agent import AgentRunner
 
-def run_agent(user_id: str, incoming: str) -> None:
     try:
-        AgentRunner(user_id).run(incoming)
+        runner = await AgentRunner.create(user_id)
+        await asyncio.to_thread(runner.run, incoming)
     except Exception as exc:  # pragma: no cover
         logger.exception("Agent run failed: %s", exc) 
\ No newline at end of file
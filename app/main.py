@@ -1,10 +1,22 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from app.handlers import webhook_handler, scheduled_handler
+from app.services.whatsapp import whatsapp_client
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    # Outbound messages are logged in the background; persist them before exit
+    await whatsapp_client.close()
+
 
-app = FastAPI(title="DietBot API")
+app = FastAPI(title="DietBot API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 app.include_router(webhook_handler.router)
 app.include_router(scheduled_handler.router)
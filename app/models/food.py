@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Macros(BaseModel):
@@ -8,9 +8,7 @@ class Macros(BaseModel):
     carbs_g: float = Field(..., ge=0)
     fat_g: float = Field(..., ge=0)
 
-    class Config:
-        arbitrary_types_allowed = True
-        orm_mode = True
+    model_config = ConfigDict(arbitrary_types_allowed=True, from_attributes=True, frozen=True)
 
 
 class Food(BaseModel):
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ImageData(BaseModel):
@@ -8,4 +8,6 @@ class ImageData(BaseModel):
     height: int = Field(..., ge=1)
     mime_type: str
     resolution: str | None = None  # e.g., "1024x768"
-    url: str  # Signed or public GCS URL 
\ No newline at end of file
+    url: str  # Signed or public GCS URL 
+
+    model_config = ConfigDict(frozen=True)
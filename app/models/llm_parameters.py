@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class LLMParameters(BaseModel):
@@ -11,4 +11,6 @@ class LLMParameters(BaseModel):
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
-    response: str 
\ No newline at end of file
+    response: str 
+
+    model_config = ConfigDict(frozen=True)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from .food import Food
 from .image_data import ImageData
@@ -21,5 +21,13 @@ class Message(BaseModel):
     content: str
     gcs_path: str | None = None
     image_data: ImageData | None = None
-    food: list[Food] = []
-    llm_parameters: LLMParameters | None = None 
\ No newline at end of file
+    food: list[Food] = Field(default_factory=list)
+    llm_parameters: LLMParameters | None = None 
+
+    @field_validator("timestamp")
+    @classmethod
+    def _assume_utc(cls, value: datetime) -> datetime:
+        # Older rows were written with naive utcnow(); keep all timestamps comparable
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+    model_config = ConfigDict(frozen=True, revalidate_instances="never")
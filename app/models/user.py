@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Schedule(BaseModel):
-    morning_checkin: str = Field("07:00", regex=r"^\d{2}:\d{2}$")
-    daily_recap: str = Field("21:00", regex=r"^\d{2}:\d{2}$")
+    morning_checkin: str = Field("07:00", pattern=r"^\d{2}:\d{2}$")
+    daily_recap: str = Field("21:00", pattern=r"^\d{2}:\d{2}$")
+
+    model_config = ConfigDict(frozen=True)
 
 
 class UserProfile(BaseModel):
@@ -18,5 +20,7 @@ class UserProfile(BaseModel):
     goal_weight_kg: float
     activity_level: str
     timezone: int = 0  # UTC offset, e.g., 0, 1, -5
-    schedule: Schedule = Schedule()
-    calorie_budget: int | None = None 
\ No newline at end of file
+    schedule: Schedule = Field(default_factory=Schedule)
+    calorie_budget: int | None = None 
+
+    model_config = ConfigDict(frozen=True, revalidate_instances="never")
@@ -4,6 +4,7 @@ from __future__ import annotations
 import io
 import logging
 from datetime import date
+from functools import lru_cache
 from typing import Tuple
 
 from PIL import Image, ImageDraw, ImageFont
@@ -25,6 +26,7 @@ _BAR_COLORS = {
 _MARGIN = 40
 
 
+@lru_cache(maxsize=16)
 def _load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     try:
         return ImageFont.truetype("arial.ttf", size)
@@ -33,15 +35,15 @@ def _load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
 
 
 def _aggregate(messages: list[Message]) -> Tuple[float, dict[str, float]]:
-    total_cal = 0.0
-    macros = {"protein": 0.0, "carbs": 0.0, "fat": 0.0}
+    total_cal = protein = carbs = fat = 0.0
     for m in messages:
         for food in m.food:
             total_cal += food.calories
-            macros["protein"] += food.macros.protein_g
-            macros["carbs"] += food.macros.carbs_g
-            macros["fat"] += food.macros.fat_g
-    return total_cal, macros
+            fm = food.macros
+            protein += fm.protein_g
+            carbs += fm.carbs_g
+            fat += fm.fat_g
+    return total_cal, {"protein": protein, "carbs": carbs, "fat": fat}
 
 
 def _draw_bar_chart(draw: ImageDraw.Draw, macros: dict[str, float], top_y: int) -> None:
@@ -93,12 +95,12 @@ def generate_png_report(user_id: str, target_date: date) -> str:
 
     # Save to bytes
     buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
+    img.save(buffer, format="PNG", compress_level=1, optimize=False)
     png_bytes = buffer.getvalue()
 
     # Upload
     filename = f"report_{target_date.isoformat()}"
-    gs_path, url = storage_service.upload_image(
+    gs_path, url, _ = storage_service.upload_image(
         png_bytes,
         user_id,
         filename,
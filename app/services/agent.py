@@ -1,15 +1,19 @@
-"""Agent orchestration using LangChain tools."""
+"""Agent orchestration over the LLM tool-calling facade."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Any
 
-from langchain.schema import ChatMessage
+import orjson
+from pydantic import BaseModel
 
 from app.services.llm import chat_completion
-from app.services.agent_tools import TOOL_REGISTRY
-from app.services.firebase_db import firebase_db
+from app.services.agent_tools import TOOL_INPUTS, TOOL_NAMES, TOOL_REGISTRY
+from app.services.firebase_db import firebase_db, firebase_db_async
+from app.models import UserProfile
 
 logger = logging.getLogger(__name__)
 
@@ -20,35 +24,74 @@ SYSTEM_PROMPT = (
     "appropriate tool. If you need to send a plain reply, use the Respond tool."
 )
 
+# Firebase stores assistant turns as "ai"; chat APIs expect "assistant"
+_ROLE_MAP = {"ai": "assistant"}
+
+_JSON_SCALARS = (str, int, float, bool)
+
+
+@lru_cache(maxsize=None)
+def _is_flat(model_cls: type[BaseModel]) -> bool:
+    """Return True if every field of *model_cls* is a JSON scalar."""
+    return all(f.annotation in _JSON_SCALARS for f in model_cls.model_fields.values())
+
+
+def _dump_tool_input(model: BaseModel) -> str:
+    """Serialise a tool input, skipping pydantic's serializer for flat models."""
+    if _is_flat(type(model)):
+        return orjson.dumps(model.__dict__).decode()
+    return model.model_dump_json()
+
 
 class AgentRunner:
     """Simple looped agent to process a single user message."""
 
     MAX_ITERS = 4
-
-    def __init__(self, user_id: str):
+    CONTEXT_LIMIT = 10
+
+    def __init__(
+        self,
+        user_id: str,
+        *,
+        profile: UserProfile | None = None,
+        recent: list[dict] | None = None,
+    ):
         self.user_id = user_id
-        profile = firebase_db.get_profile(user_id)
+        if profile is None:
+            profile = firebase_db.get_profile(user_id)
         if profile is None:
             raise ValueError("Unknown user")
         self.phone_number = profile.phone_number
-
-    def build_context(self) -> List[ChatMessage]:
-        """Return last N messages as ChatMessage objects."""
-        recent = firebase_db.fetch_recent_messages(self.user_id, limit=10, as_dict=True)
-        msgs: List[ChatMessage] = [ChatMessage(role="system", content=SYSTEM_PROMPT)]
+        self._recent = recent
+
+    @classmethod
+    async def create(cls, user_id: str) -> AgentRunner:
+        """Build a runner, fetching profile and recent history concurrently."""
+        profile, recent = await asyncio.gather(
+            firebase_db_async.get_profile(user_id),
+            firebase_db_async.fetch_recent_messages(user_id, cls.CONTEXT_LIMIT, as_dict=True),
+        )
+        if profile is None:
+            raise ValueError("Unknown user")
+        return cls(user_id, profile=profile, recent=recent)
+
+    def build_context(self) -> List[dict[str, str]]:
+        """Return last N messages as role/content dicts."""
+        recent = self._recent
+        if recent is None:
+            recent = firebase_db.fetch_recent_messages(self.user_id, limit=self.CONTEXT_LIMIT, as_dict=True)
+        msgs: List[dict[str, str]] = [{"role": "system", "content": SYSTEM_PROMPT}]
         for m in reversed(recent):
-            msgs.append(ChatMessage(role=m["role"], content=m["content"]))
+            msgs.append({"role": _ROLE_MAP.get(m["role"], m["role"]), "content": m["content"]})
         return msgs
 
     def run(self, incoming_text: str) -> None:
         messages = self.build_context()
-        messages.append(ChatMessage(role="user", content=incoming_text))
+        messages.append({"role": "user", "content": incoming_text})
 
         for _ in range(self.MAX_ITERS):
             # Call LLM with tools
-            tool_classes = [cls for cls, _ in TOOL_REGISTRY.values() if cls]
-            response, _ = chat_completion(messages, tools=tool_classes)
+            response, _ = chat_completion(messages, tools=TOOL_INPUTS)
 
             if not isinstance(response, BaseModel):
                 # Raw text – send it directly via Respond tool
@@ -57,11 +100,11 @@ class AgentRunner:
                 respond_exec(self.user_id, self.phone_number, RespondInput(response=response))
                 break
 
-            tool_name = response.__class__.__name__
             input_data = response
-            entry = TOOL_REGISTRY.get(tool_name)
+            tool_name = TOOL_NAMES.get(type(response))
+            entry = TOOL_REGISTRY.get(tool_name) if tool_name is not None else None
             if entry is None:
-                logger.warning("Unknown tool returned: %s", tool_name)
+                logger.warning("Unknown tool returned: %s", type(response).__name__)
                 break
             _, executor = entry
             try:
@@ -73,7 +116,7 @@ class AgentRunner:
                 else:
                     executor(self.user_id)
                 # Append assistant tool result to context
-                messages.append(ChatMessage(role="assistant", content=input_data.model_dump_json()))
+                messages.append({"role": "assistant", "content": _dump_tool_input(input_data)})
             except Exception as exc:
                 logger.error("Tool execution failed: %s", exc)
                 break 
\ No newline at end of file
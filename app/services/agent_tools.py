@@ -155,4 +155,8 @@ TOOL_REGISTRY: dict[str, tuple[type[BaseModel], Callable[..., Any]]] = {
     "GenerateDailyReport": (None, generate_daily_report_exec),
     "Respond": (RespondInput, respond_exec),
     "EndConversation": (None, end_conversation_exec),
-} 
\ No newline at end of file
+} 
+
+# Tools the LLM can call, keyed by registry name, and the reverse lookup
+TOOL_INPUTS: dict[str, type[BaseModel]] = {name: cls for name, (cls, _) in TOOL_REGISTRY.items() if cls is not None}
+TOOL_NAMES: dict[type[BaseModel], str] = {cls: name for name, cls in TOOL_INPUTS.items()}
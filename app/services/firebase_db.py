@@ -6,19 +6,31 @@ messages stored under the following path structure:
 /users/{user_id}/profile
 /users/{user_id}/messages/{message_id}
 
-All data is validated with Pydantic models before being written or
-returned. Callers may request the results as models or raw dictionaries
-(using the ``as_dict`` keyword).
+All data is validated with Pydantic models before being written. Reads
+are validated too, except message reads with ``as_dict=True`` while
+``TRUST_DB_READS`` is on: those return the stored records with internal
+keys removed and missing top-level fields filled with model defaults.
+Callers may request the results as models or raw dictionaries (using the
+``as_dict`` keyword).
 """
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
-from typing import Literal, Any, List
+from functools import partial
+from operator import itemgetter
+from typing import Literal, Any, Iterable, List
 
 import firebase_admin
+import orjson
+from cachetools import TTLCache
 from firebase_admin import credentials, db
+from pydantic import TypeAdapter
 
 from app.config import get_settings
 from app.models import UserProfile, Message
@@ -26,6 +38,8 @@ from app.models import UserProfile, Message
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_BY_TIMESTAMP = itemgetter("timestamp")
+
 # ---------------------------------------------------------------------------
 # Initialise the Firebase Admin SDK exactly once.
 # ---------------------------------------------------------------------------
@@ -37,7 +51,7 @@ if not firebase_admin._apps:  # type: ignore[attr-defined]
             cred_obj: credentials.Base = (
                 credentials.Certificate(settings.firebase_credentials_json)
                 if settings.firebase_credentials_json.endswith(".json")
-                else credentials.Certificate(json.loads(settings.firebase_credentials_json))
+                else credentials.Certificate(orjson.loads(settings.firebase_credentials_json))
             )
         else:
             # Attempt default credentials (useful on Cloud Run with workload identity)
@@ -61,50 +75,129 @@ if not firebase_admin._apps:  # type: ignore[attr-defined]
 # ---------------------------------------------------------------------------
 
 
-def _validate_message_dict(data: dict[str, Any]) -> dict[str, Any]:
-    """Validate and normalise a raw message dict.
+# Built once; reuses pydantic-core's compiled validator/serializer per call
+_MESSAGE_ADAPTER = TypeAdapter(Message)
+_MSG_LIST_ADAPTER = TypeAdapter(list[Message])
+_PROFILE_ADAPTER = TypeAdapter(UserProfile)
+
+
+def _validate_message(data: dict[str, Any]) -> Message:
+    """Validate a raw message dict into a model."""
+
+    return _MESSAGE_ADAPTER.validate_python(data)
+
+
+def _validate_profile(data: dict[str, Any]) -> UserProfile:
+    return _PROFILE_ADAPTER.validate_python(data)
+
+
+def _stored_message(item: dict[str, Any]) -> dict[str, Any]:
+    """Return a stored message record in ``Message``'s top-level shape.
 
-    Returns the validated JSON-ready dict.
+    Realtime DB drops null and empty values, so those keys are restored with
+    their defaults; the query-only ``role_type`` child is removed.
     """
 
-    msg = Message.model_validate(data)
-    return msg.model_dump(mode="json")
+    record = {"gcs_path": None, "image_data": None, "food": [], "llm_parameters": None, **item}
+    record.pop("role_type", None)
+    return record
+
+
+def _messages_from_db(items: list[dict[str, Any]], *, as_dict: bool) -> List[Message] | List[dict]:
+    """Turn raw Firebase message dicts into the requested shape.
+
+    Writes are validated, so with ``TRUST_DB_READS`` dict reads skip
+    validation and return the stored records (nested values and timestamps
+    as stored); models are always validated exactly once.
+    """
+
+    if as_dict and settings.trust_db_reads:
+        return [_stored_message(i) for i in items]
+    messages = _MSG_LIST_ADAPTER.validate_python(items)
+    return _MSG_LIST_ADAPTER.dump_python(messages, mode="json") if as_dict else messages
+
+
+class _PushIdGenerator:
+    """Generate Firebase-style push keys locally.
 
+    ``Reference.push()`` in firebase_admin POSTs to the server just to obtain
+    a key. The keys follow a public scheme (48-bit millisecond timestamp plus
+    72 random bits, base64-ish), so generating them here keeps them
+    chronologically ordered and compatible with existing data.
+    """
+
+    _CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
 
-def _validate_profile_dict(data: dict[str, Any]) -> dict[str, Any]:
-    profile = UserProfile.model_validate(data)
-    return profile.model_dump(mode="json")
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._last_rand = [0] * 12
+
+    def __call__(self) -> str:
+        now = int(time.time() * 1000)
+        with self._lock:
+            if now == self._last_ms:
+                # Same millisecond: bump the random suffix to preserve ordering
+                for i in range(11, -1, -1):
+                    if self._last_rand[i] != 63:
+                        self._last_rand[i] += 1
+                        break
+                    self._last_rand[i] = 0
+            else:
+                self._last_ms = now
+                self._last_rand = [secrets.randbelow(64) for _ in range(12)]
+            rand = list(self._last_rand)
+
+        ts_chars = []
+        for _ in range(8):
+            ts_chars.append(self._CHARS[now % 64])
+            now //= 64
+        return "".join(reversed(ts_chars)) + "".join(self._CHARS[i] for i in rand)
+
+
+_new_push_id = _PushIdGenerator()
 
 
 class FirebaseDB:  # pylint: disable=too-few-public-methods
     """Wrapper around Firebase Realtime Database operations."""
 
+    _PROFILE_CACHE_TTL = 60  # seconds
+
     def __init__(self) -> None:
         self._root = db.reference("/")
+        # Profiles change rarely; share one read across handlers for a short TTL
+        self._profile_cache: TTLCache = TTLCache(maxsize=1024, ttl=self._PROFILE_CACHE_TTL)
+        self._profile_lock = threading.Lock()
 
     # -------------------------------------------------------------------
     # User Profile
     # -------------------------------------------------------------------
 
     def get_profile(self, user_id: str, *, as_dict: bool = False) -> UserProfile | dict | None:
-        ref = self._root.child("users").child(user_id).child("profile")
-        data = ref.get()
-        if data is None:
-            return None
-        validated = _validate_profile_dict(data)
-        return validated if as_dict else UserProfile.model_validate(validated)
+        with self._profile_lock:
+            profile = self._profile_cache.get(user_id)
+        if profile is None:
+            ref = self._root.child("users").child(user_id).child("profile")
+            data = ref.get()
+            if data is None:
+                return None
+            profile = _validate_profile(data)
+            with self._profile_lock:
+                self._profile_cache[user_id] = profile
+        # Profiles are frozen, so the cached instance can be shared as-is
+        return _PROFILE_ADAPTER.dump_python(profile, mode="json") if as_dict else profile
 
     def set_profile(self, profile: UserProfile | dict[str, Any]) -> None:
-        if isinstance(profile, UserProfile):
-            data = profile.model_dump(mode="json")
-            user_id = profile.user_id
-        else:
+        if not isinstance(profile, UserProfile):
             # Validate first
-            data = _validate_profile_dict(profile)
-            user_id = data["user_id"]
+            profile = _validate_profile(profile)
+        data = _PROFILE_ADAPTER.dump_python(profile, mode="json")
+        user_id = profile.user_id
 
         ref = self._root.child("users").child(user_id).child("profile")
         ref.set(data)
+        with self._profile_lock:
+            self._profile_cache.pop(user_id, None)
         logger.debug("Profile set for user_id=%s", user_id)
 
     # -------------------------------------------------------------------
@@ -115,24 +208,25 @@ class FirebaseDB:  # pylint: disable=too-few-public-methods
         return self._root.child("users").child(user_id).child("messages")
 
     def add_message(self, user_id: str, message: Message | dict[str, Any]) -> str:
-        if isinstance(message, Message):
-            data = message.model_dump(mode="json")
-        else:
-            data = _validate_message_dict(message)
+        if not isinstance(message, Message):
+            message = _validate_message(message)
+        data = _MESSAGE_ADAPTER.dump_python(message, mode="json")
+
+        # Composite key so role+type can be filtered by a single indexed query
+        data["role_type"] = f"{data['role']}:{data['type']}"
 
-        # push() returns a reference with a generated key
-        push_ref = self._messages_ref(user_id).push()
-        data["id"] = push_ref.key  # Store the generated ID inside the document
-        push_ref.set(data)
-        logger.debug("Added message id=%s to user_id=%s", push_ref.key, user_id)
-        return push_ref.key  # type: ignore[return-value]
+        # Key generated locally so the write is a single request
+        key = _new_push_id()
+        data["id"] = key  # Store the generated ID inside the document
+        self._messages_ref(user_id).child(key).set(data)
+        logger.debug("Added message id=%s to user_id=%s", key, user_id)
+        return key
 
     def get_message(self, user_id: str, message_id: str, *, as_dict: bool = False) -> Message | dict | None:
         data = self._messages_ref(user_id).child(message_id).get()
         if data is None:
             return None
-        validated = _validate_message_dict(data)
-        return validated if as_dict else Message.model_validate(validated)
+        return _messages_from_db([data], as_dict=as_dict)[0]
 
     def fetch_recent_messages(
         self, user_id: str, limit: int = 20, *, as_dict: bool = False
@@ -140,12 +234,8 @@ class FirebaseDB:  # pylint: disable=too-few-public-methods
         query = self._messages_ref(user_id).order_by_child("timestamp").limit_to_last(limit)
         raw_items = query.get() or {}
         # raw_items is a dict keyed by message_id -> data
-        messages = list(raw_items.values())
-        messages.sort(key=lambda m: m["timestamp"], reverse=True)
-        validated = [_validate_message_dict(item) for item in messages]
-        if as_dict:
-            return validated
-        return [Message.model_validate(v) for v in validated]
+        messages = sorted(raw_items.values(), key=_BY_TIMESTAMP, reverse=True)
+        return _messages_from_db(messages, as_dict=as_dict)
 
     def fetch_messages_by_date(
         self, user_id: str, target_date: date, *, as_dict: bool = False
@@ -170,30 +260,99 @@ class FirebaseDB:  # pylint: disable=too-few-public-methods
         limit: int = 100,
         as_dict: bool = False,
     ) -> List[Message] | List[dict]:
-        query = self._messages_ref(user_id).order_by_child("timestamp")
-        if start_ts is not None:
-            query = query.start_at(start_ts.isoformat())
-        if end_ts is not None:
-            query = query.end_at(end_ts.isoformat())
+        query = self._messages_ref(user_id)
+        if start_ts is None and end_ts is None and (role is not None or msg_type is not None):
+            # Firebase can order/filter on one child per query; use the indexed one
+            if role is not None and msg_type is not None:
+                query = query.order_by_child("role_type").equal_to(f"{role}:{msg_type}")
+            elif role is not None:
+                query = query.order_by_child("role").equal_to(role)
+            else:
+                query = query.order_by_child("type").equal_to(msg_type)
+            role = msg_type = None
+        else:
+            query = query.order_by_child("timestamp")
+            if start_ts is not None:
+                query = query.start_at(start_ts.isoformat())
+            if end_ts is not None:
+                query = query.end_at(end_ts.isoformat())
         query = query.limit_to_last(limit)
 
         raw_items = query.get() or {}
-        items: list[dict[str, Any]] = list(raw_items.values())
-
-        # In-Python filtering for role/type
-        if role is not None:
-            items = [i for i in items if i.get("role") == role]
-        if msg_type is not None:
-            items = [i for i in items if i.get("type") == msg_type]
+        items: Iterable[dict[str, Any]] = raw_items.values()
+
+        # Role/type filters that could not be combined with a timestamp range
+        if role is not None or msg_type is not None:
+            items = (
+                i
+                for i in items
+                if (role is None or i.get("role") == role) and (msg_type is None or i.get("type") == msg_type)
+            )
 
         # Sort newest first
-        items.sort(key=lambda m: m["timestamp"], reverse=True)
+        return _messages_from_db(sorted(items, key=_BY_TIMESTAMP, reverse=True), as_dict=as_dict)
+
+
+class AsyncFirebaseDB:
+    """Awaitable facade over :class:`FirebaseDB` for use on the event loop.
 
-        validated = [_validate_message_dict(i) for i in items]
-        if as_dict:
-            return validated
-        return [Message.model_validate(v) for v in validated]
+    firebase_admin's Realtime Database client is blocking, so every call is
+    run on a dedicated, bounded thread pool instead of the loop thread.
+    """
+
+    def __init__(self, sync_db: FirebaseDB, *, max_workers: int = 32) -> None:
+        self._db = sync_db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="firebase")
+
+    async def _run(self, func, /, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def get_profile(self, user_id: str, *, as_dict: bool = False) -> UserProfile | dict | None:
+        return await self._run(self._db.get_profile, user_id, as_dict=as_dict)
+
+    async def set_profile(self, profile: UserProfile | dict[str, Any]) -> None:
+        await self._run(self._db.set_profile, profile)
+
+    async def add_message(self, user_id: str, message: Message | dict[str, Any]) -> str:
+        return await self._run(self._db.add_message, user_id, message)
+
+    async def get_message(self, user_id: str, message_id: str, *, as_dict: bool = False) -> Message | dict | None:
+        return await self._run(self._db.get_message, user_id, message_id, as_dict=as_dict)
+
+    async def fetch_recent_messages(
+        self, user_id: str, limit: int = 20, *, as_dict: bool = False
+    ) -> List[Message] | List[dict]:
+        return await self._run(self._db.fetch_recent_messages, user_id, limit, as_dict=as_dict)
+
+    async def fetch_messages_by_date(
+        self, user_id: str, target_date: date, *, as_dict: bool = False
+    ) -> List[Message] | List[dict]:
+        return await self._run(self._db.fetch_messages_by_date, user_id, target_date, as_dict=as_dict)
+
+    async def query_messages(
+        self,
+        user_id: str,
+        *,
+        start_ts: datetime | None = None,
+        end_ts: datetime | None = None,
+        role: Literal["user", "ai"] | None = None,
+        msg_type: Literal["text", "image"] | None = None,
+        limit: int = 100,
+        as_dict: bool = False,
+    ) -> List[Message] | List[dict]:
+        return await self._run(
+            self._db.query_messages,
+            user_id,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            role=role,
+            msg_type=msg_type,
+            limit=limit,
+            as_dict=as_dict,
+        )
 
 
-# Instantiate a singleton for app-wide reuse
-firebase_db = FirebaseDB() 
\ No newline at end of file
+# Instantiate singletons for app-wide reuse
+firebase_db = FirebaseDB()
+firebase_db_async = AsyncFirebaseDB(firebase_db) 
\ No newline at end of file
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Sequence, Any
+from typing import Any, Mapping, Sequence
+
+from pydantic import BaseModel
 
-from langchain.schema import ChatMessage
 
 from .registry import get_provider
 
@@ -14,9 +15,9 @@ __all__ = [
 
 
 def chat_completion(
-    messages: Sequence[ChatMessage],
+    messages: Sequence[dict[str, Any]],
     *,
-    tools: list[Any] | None = None,
+    tools: Mapping[str, type[BaseModel]] | Sequence[type[BaseModel]] | None = None,
     tool_choice: str | None = None,
     response_model: type | None = None,
 ):
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, Sequence
+from typing import Any, Mapping, Sequence
 
-from langchain.schema import ChatMessage
 from pydantic import BaseModel
 
 
@@ -14,9 +13,9 @@ class LLMProvider(ABC):
 
     def chat(
         self,
-        messages: Sequence[ChatMessage],
+        messages: Sequence[dict[str, Any]],
         *,
-        tools: list[Any] | None = None,
+        tools: Mapping[str, type[BaseModel]] | Sequence[type[BaseModel]] | None = None,
         tool_choice: str | None = None,
         response_model: type[BaseModel] | None = None,
     ) -> tuple[Any, dict]:
@@ -1,15 +1,11 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Sequence, List
-import time
-from functools import wraps
+from functools import lru_cache
+from typing import Any, Mapping, Sequence
 
-from langchain_openai import ChatOpenAI
-from langchain.schema import ChatMessage
-from pydantic import BaseModel, ValidationError
-from langchain_core.output_parsers.openai_tools import PydanticToolsParser
-from langchain.output_parsers import PydanticOutputParser
+from openai import OpenAI
+from pydantic import BaseModel
 
 from app.config import get_settings
 
@@ -19,56 +15,85 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+@lru_cache(maxsize=None)
+def _tool_spec(name: str, model_cls: type[BaseModel]) -> dict[str, Any]:
+    """Return the OpenAI function-tool definition for *model_cls* (built once)."""
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": (model_cls.__doc__ or "").strip(),
+            "parameters": model_cls.model_json_schema(),
+        },
+    }
+
+
+@lru_cache(maxsize=None)
+def _response_format(model_cls: type[BaseModel]) -> dict[str, Any]:
+    """Return the JSON-schema response format for *model_cls* (built once)."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model_cls.__name__, "schema": model_cls.model_json_schema()},
+    }
+
+
 class OpenAIProvider(LLMProvider):
     name = "openai"
 
     def __init__(self) -> None:
-        self._llm = ChatOpenAI(
-            model_name=settings.openai_model,
-            api_key=settings.openai_api_key,
-            temperature=settings.openai_temperature,
-            top_p=settings.openai_top_p,
-            max_tokens=settings.openai_max_tokens,
-        )
+        self._client = OpenAI(api_key=settings.openai_api_key, max_retries=3)
 
     def chat(
         self,
-        messages: Sequence[ChatMessage],
+        messages: Sequence[dict[str, Any]],
         *,
-        tools: list[Any] | None = None,
+        tools: Mapping[str, type[BaseModel]] | Sequence[type[BaseModel]] | None = None,
         tool_choice: str | None = None,
         response_model: type[BaseModel] | None = None,
     ) -> tuple[Any, dict]:
         """Execute a chat completion with optional tools / response schema.
 
         Returned first element is either raw assistant text or a validated
-        Pydantic model instance if *response_model* was supplied.
-        """
+        Pydantic model instance: the first tool call's arguments when *tools*
+        were supplied, or the reply itself if *response_model* was supplied.
 
-        chain = self._llm
+        *tools* maps tool names to their input models; a plain sequence of
+        models is named after the classes. Without an explicit *tool_choice*
+        the model must call one of them, but may pick which.
+        """
 
-        # Tool binding
+        kwargs: dict[str, Any] = {
+            "model": settings.openai_model,
+            "messages": list(messages),
+            "temperature": settings.openai_temperature,
+            "top_p": settings.openai_top_p,
+            "max_tokens": settings.openai_max_tokens,
+        }
+        tools_by_name: dict[str, type[BaseModel]] = {}
         if tools:
-            chain = chain.bind_tools(tools=tools, tool_choice=tool_choice or tools[0].__name__)
-            parser = PydanticToolsParser(tools=tools)
-            chain = chain | parser
+            tools_by_name = dict(tools) if isinstance(tools, Mapping) else {t.__name__: t for t in tools}
+            kwargs["tools"] = [_tool_spec(name, t) for name, t in tools_by_name.items()]
+            kwargs["tool_choice"] = (
+                {"type": "function", "function": {"name": tool_choice}} if tool_choice else "required"
+            )
         elif response_model is not None:
-            parser = PydanticOutputParser(pydantic_object=response_model)
-            chain = chain | parser
-
-        # Add retry capability
-        chain = chain.with_retry(max_retries=3)
-
-        # Invoke synchronously
-        output = chain.invoke(messages)
-
-        # Attempt to extract usage if ChatOpenAI provides metadata
-        usage: dict[str, Any] = {}
-        if hasattr(self._llm, "client") and hasattr(self._llm.client, "last_response"):
-            meta_raw = getattr(self._llm.client, "last_response", None)
-            if meta_raw and isinstance(meta_raw, dict):
-                usage = meta_raw.get("usage", {})
+            kwargs["response_format"] = _response_format(response_model)
+
+        resp = self._client.chat.completions.create(**kwargs)
+        reply = resp.choices[0].message
+
+        output: Any = reply.content or ""
+        if tools and reply.tool_calls:
+            call = reply.tool_calls[0].function
+            model_cls = tools_by_name.get(call.name)
+            if model_cls is None:
+                logger.warning("LLM called unknown tool: %s", call.name)
+            else:
+                output = model_cls.model_validate_json(call.arguments)
+        elif response_model is not None:
+            output = response_model.model_validate_json(output)
 
+        usage = resp.usage.model_dump() if resp.usage is not None else {}
         meta = {
             "model": settings.openai_model,
             "temperature": settings.openai_temperature,
@@ -76,4 +101,4 @@ class OpenAIProvider(LLMProvider):
             "max_tokens": settings.openai_max_tokens,
             **usage,
         }
-        return output, meta 
\ No newline at end of file
+        return output, meta
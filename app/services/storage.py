@@ -10,32 +10,59 @@ Callers receive both the *gs://* path and an externally accessible URL
 """
 from __future__ import annotations
 
+import asyncio
 import io
 import logging
 import os
+import threading
+import time
 from datetime import timedelta
 from typing import Tuple
 
+import google.auth
+from cachetools import LRUCache
+from google.auth.credentials import Signing
+from google.auth.transport.requests import Request
 from google.cloud import storage
 from PIL import Image
 
 from app.config import get_settings
+from app.models import ImageData
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_VALID_IMAGE_PREFIX = "image/"
+_CT_TO_EXT = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+# Formats that may be stored as uploaded when already small enough
+_PASSTHROUGH_TYPES = frozenset({"image/jpeg", "image/webp"})
+
 
 class StorageService:  # pylint: disable=too-few-public-methods
     """Wrapper around Google Cloud Storage uploads and signed URLs."""
 
-    _VALID_IMAGE_PREFIX = "image/"
     _MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # 10 MB
+    _URL_REUSE_SLACK = 0.1  # fraction of the requested lifetime a reused URL may have used up
 
     def __init__(self) -> None:
         self._client = storage.Client()
         self._bucket = self._client.bucket(settings.bucket_name)
         if not self._bucket.exists():  # pragma: no cover
             logger.warning("GCS bucket '%s' does not exist or access denied.", settings.bucket_name)
+        # (user_id, message_id) -> blob name; the extension never changes after upload
+        self._blob_names: LRUCache = LRUCache(maxsize=4096)
+        # blob name -> (signed URL, expiry as epoch seconds)
+        self._signed_urls: LRUCache = LRUCache(maxsize=4096)
+        # LRUCache reorders on every read; uploads and reports sign from worker threads
+        self._cache_lock = threading.Lock()
+        # Loaded once and reused for every signature instead of per-URL lookups
+        self._signing_credentials, _ = google.auth.default()
+        self._auth_request = Request()
 
     # ------------------------------------------------------------------
     # Public helpers
@@ -50,8 +77,11 @@ class StorageService:  # pylint: disable=too-few-public-methods
         content_type: str,
         compress: bool = True,
         expires: timedelta = timedelta(days=7),
-    ) -> Tuple[str, str]:
-        """Upload an image and return (gs_path, url).
+    ) -> Tuple[str, str, ImageData | None]:
+        """Upload an image and return (gs_path, url, image_data).
+
+        *image_data* describes the stored object (final dimensions and mime
+        type), or is None if the image header could not be read.
 
         Parameters
         ----------
@@ -70,31 +100,37 @@ class StorageService:  # pylint: disable=too-few-public-methods
             Signed URL expiry (ignored if PUBLIC_IMAGES=true).
         """
 
-        if not content_type.startswith(self._VALID_IMAGE_PREFIX):
+        if not content_type.startswith(_VALID_IMAGE_PREFIX):
             raise ValueError("Unsupported content_type; expected image/*, got %s" % content_type)
 
         if len(file_bytes) > self._MAX_UPLOAD_BYTES:
             raise ValueError("Image exceeds 10 MB size limit.")
 
-        ext = _content_type_to_extension(content_type)
+        ext = _CT_TO_EXT.get(content_type.lower(), "jpg")
         blob_name = f"users/{user_id}/{message_id}.{ext}"
         blob = self._bucket.blob(blob_name)
 
-        data_to_upload = file_bytes
+        # BytesIO shares the caller's buffer until written to, so this does not copy
+        data_to_upload = io.BytesIO(file_bytes)
         final_content_type = content_type
+        size: Tuple[int, int] | None = None
 
         if compress:
             try:
-                data_to_upload, final_content_type = _compress_image(
+                data_to_upload, final_content_type, size = _compress_image(
                     file_bytes,
                     content_type,
                     max_dim=settings.image_max_dim,
                     quality=settings.image_quality,
+                    passthrough_max_bytes=settings.image_passthrough_max_bytes,
                 )
             except Exception as exc:  # pragma: no cover
                 logger.warning("Image compression failed, uploading original bytes: %s", exc)
+        if size is None:
+            size = image_size(file_bytes)
 
-        blob.upload_from_string(data_to_upload, content_type=final_content_type)
+        nbytes = data_to_upload.seek(0, io.SEEK_END)
+        blob.upload_from_file(data_to_upload, content_type=final_content_type, size=nbytes, rewind=True)
 
         if settings.public_images:
             try:
@@ -102,13 +138,40 @@ class StorageService:  # pylint: disable=too-few-public-methods
                 url = blob.public_url
             except Exception as exc:  # pragma: no cover
                 logger.error("Failed to make blob public: %s", exc)
-                url = blob.generate_signed_url(expires)
+                url = self._sign(blob_name, expires)
         else:
-            url = blob.generate_signed_url(expires)
+            url = self._sign(blob_name, expires)
 
+        with self._cache_lock:
+            self._blob_names[(user_id, message_id)] = blob_name
         gs_path = f"gs://{settings.bucket_name}/{blob_name}"
         logger.debug("Uploaded image to %s", gs_path)
-        return gs_path, url
+        image_data = None
+        if size is not None:
+            width, height = size
+            image_data = ImageData(
+                width=width,
+                height=height,
+                mime_type=final_content_type,
+                resolution=f"{width}x{height}",
+                url=url,
+            )
+        return gs_path, url, image_data
+
+    async def upload_image_async(
+        self,
+        file_bytes: bytes,
+        user_id: str,
+        message_id: str,
+        **kwargs,
+    ) -> Tuple[str, str, ImageData | None]:
+        """Async variant of :meth:`upload_image` for use on the event loop.
+
+        Compression and the GCS upload run in a worker thread so the loop
+        stays free for concurrent webhook deliveries.
+        """
+
+        return await asyncio.to_thread(self.upload_image, file_bytes, user_id, message_id, **kwargs)
 
     def get_signed_url(
         self,
@@ -117,33 +180,83 @@ class StorageService:  # pylint: disable=too-few-public-methods
         *,
         expires: timedelta = timedelta(days=7),
     ) -> str:
-        ext_candidates = ["jpg", "jpeg", "png", "webp"]
-        for ext in ext_candidates:
-            blob = self._bucket.blob(f"users/{user_id}/{message_id}.{ext}")
-            if blob.exists():
-                return blob.generate_signed_url(expires)
-        raise FileNotFoundError("Image blob not found for message_id=%s" % message_id)
+        blob_name = self._find_blob_name(user_id, message_id)
+        if blob_name is None:
+            raise FileNotFoundError("Image blob not found for message_id=%s" % message_id)
+        with self._cache_lock:
+            cached = self._signed_urls.get(blob_name)
+        if cached is not None:
+            # Reuse only a URL whose remaining lifetime is close to, but not above, what was asked for
+            remaining = cached[1] - time.time()
+            wanted = expires.total_seconds()
+            if wanted * (1 - self._URL_REUSE_SLACK) <= remaining <= wanted:
+                return cached[0]
+        return self._sign(blob_name, expires)
 
     def delete_image(self, user_id: str, message_id: str) -> None:
-        for ext in ("jpg", "jpeg", "png", "webp"):
-            blob = self._bucket.blob(f"users/{user_id}/{message_id}.{ext}")
-            if blob.exists():
-                blob.delete()
-                logger.debug("Deleted image blob %s", blob.name)
+        with self._cache_lock:
+            blob_name = self._blob_names.pop((user_id, message_id), None)
+            if blob_name is not None:
+                self._signed_urls.pop(blob_name, None)
+        if blob_name is not None:
+            self._bucket.blob(blob_name).delete()
+            logger.debug("Deleted image blob %s", blob_name)
+            return
+        for blob in self._client.list_blobs(self._bucket, prefix=f"users/{user_id}/{message_id}."):
+            blob.delete()
+            logger.debug("Deleted image blob %s", blob.name)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _find_blob_name(self, user_id: str, message_id: str) -> str | None:
+        key = (user_id, message_id)
+        with self._cache_lock:
+            blob_name = self._blob_names.get(key)
+        if blob_name is not None:
+            return blob_name
+        # One listing call finds the blob whatever its extension
+        blobs = list(self._client.list_blobs(self._bucket, prefix=f"users/{user_id}/{message_id}.", max_results=1))
+        if not blobs:
+            return None
+        with self._cache_lock:
+            self._blob_names[key] = blobs[0].name
+        return blobs[0].name
+
+    def _sign(self, blob_name: str, expires: timedelta) -> str:
+        """Sign a URL for *blob_name* and remember it until it nears expiry."""
+        creds = self._signing_credentials
+        sign_kwargs: dict = {}
+        if not isinstance(creds, Signing):
+            # No private key (e.g. Compute Engine / Cloud Run): sign via IAM
+            # using the cached access token, refreshed only when it expires.
+            if not creds.valid:
+                creds.refresh(self._auth_request)
+            sign_kwargs = {"service_account_email": creds.service_account_email, "access_token": creds.token}
+        url = self._bucket.blob(blob_name).generate_signed_url(
+            version="v4", expiration=expires, credentials=creds, **sign_kwargs
+        )
+        with self._cache_lock:
+            self._signed_urls[blob_name] = (url, time.time() + expires.total_seconds())
+        return url
 
 
 # ------------------------------------------------------------------
 # Helper functions
 # ------------------------------------------------------------------
 
-def _content_type_to_extension(content_type: str) -> str:
-    mapping = {
-        "image/jpeg": "jpg",
-        "image/jpg": "jpg",
-        "image/png": "png",
-        "image/webp": "webp",
-    }
-    return mapping.get(content_type.lower(), "jpg")
+def image_size(file_bytes: bytes) -> Tuple[int, int] | None:
+    """Return (width, height) read from the image header, or None if unreadable.
+
+    Pillow parses only the header here; pixel data is never decoded.
+    """
+
+    try:
+        with Image.open(io.BytesIO(file_bytes)) as img:
+            return img.size
+    except Exception:  # pragma: no cover
+        return None
 
 
 def _compress_image(
@@ -152,18 +265,33 @@ def _compress_image(
     *,
     max_dim: int,
     quality: int,
-) -> Tuple[bytes, str]:
-    """Resize/compress image bytes using Pillow and return (bytes, new_content_type)."""
+    passthrough_max_bytes: int = 0,
+) -> Tuple[io.BytesIO, str, Tuple[int, int]]:
+    """Resize/compress image bytes using Pillow and return (buffer, new_content_type, size).
+
+    Images that already fit within *max_dim* and *passthrough_max_bytes* are
+    returned unchanged; only the header is read to decide.
+    """
 
     with Image.open(io.BytesIO(file_bytes)) as img:
-        img = img.convert("RGB")  # ensure RGB for JPEG
-        # Resize preserving aspect ratio if necessary
+        if (
+            content_type in _PASSTHROUGH_TYPES
+            and len(file_bytes) <= passthrough_max_bytes
+            and max(img.size) <= max_dim
+        ):
+            return io.BytesIO(file_bytes), content_type, img.size
+        # Let libjpeg downscale while decoding (no-op for other formats)
+        img.draft("RGB", (max_dim, max_dim))
+        if img.mode != "RGB":
+            img = img.convert("RGB")  # ensure RGB for JPEG
+        # Resize preserving aspect ratio if necessary. thumbnail() box-reduces by
+        # an integer factor first, so bilinear is enough for the final step
         width, height = img.size
         if max(width, height) > max_dim:
-            img.thumbnail((max_dim, max_dim))
+            img.thumbnail((max_dim, max_dim), Image.Resampling.BILINEAR)
         buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=quality, optimize=True)
-        return buffer.getvalue(), "image/jpeg"
+        img.save(buffer, format="JPEG", quality=quality, optimize=False, progressive=False)
+        return buffer, "image/jpeg", img.size
 
 
 # Singleton instance
@@ -5,10 +5,13 @@ Only text, image (by URL), and template messages are supported for the MVP.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+from functools import partial
 from typing import Any, Dict, Optional
 
 import httpx
+from cachetools import TTLCache
 
 from app.config import get_settings
 
@@ -29,6 +32,8 @@ class WhatsAppClient:  # pylint: disable=too-few-public-methods
     """Minimal async client for Meta WhatsApp Business Cloud API."""
 
     _BASE_GRAPH_URL = "https://graph.facebook.com"
+    _MEDIA_URL_TTL = 240  # seconds; Meta media URLs are only valid for five minutes
+    _DOWNLOAD_CHUNK = 64 * 1024
 
     def __init__(self, *, token: str, phone_id: str, version: str = "v19.0") -> None:
         self._token = token
@@ -36,7 +41,17 @@ class WhatsAppClient:  # pylint: disable=too-few-public-methods
         self._version = version
         self._base_url = f"{self._BASE_GRAPH_URL}/{self._version}"
         self._headers = {"Authorization": f"Bearer {self._token}"}
-        self._client = httpx.AsyncClient(timeout=10.0, headers=self._headers)
+        # HTTP/2 + keep-alive so the media metadata and download GETs reuse
+        # warm connections; transport retries cover connect failures only.
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60),
+        )
+        self._client = httpx.AsyncClient(timeout=10.0, headers=self._headers, transport=transport)
+        self._pending_logs: set[asyncio.Task] = set()
+        # media_id -> resolved download URL, so repeat fetches skip the metadata hop
+        self._media_urls: TTLCache = TTLCache(maxsize=10_000, ttl=self._MEDIA_URL_TTL)
 
     # ------------------------------------------------------------------
     # Public API
@@ -60,19 +75,18 @@ class WhatsAppClient:  # pylint: disable=too-few-public-methods
         message_id = await self._post_message(payload)
 
         if log_to_firebase and user_id:
-            from datetime import datetime  # local import to avoid cycles
-            from app.services.firebase_db import firebase_db
+            from datetime import datetime, timezone  # local import to avoid cycles
             from app.models import Message
 
             msg = Message(
                 id=message_id,
                 user_id=user_id,
-                timestamp=datetime.utcnow(),
+                timestamp=datetime.now(timezone.utc),
                 role="ai",
                 type="text",
                 content=body,
             )
-            firebase_db.add_message(user_id, msg)
+            self._log_outbound(user_id, msg)
 
         return message_id
 
@@ -97,20 +111,19 @@ class WhatsAppClient:  # pylint: disable=too-few-public-methods
         message_id = await self._post_message(payload)
 
         if log_to_firebase and user_id:
-            from datetime import datetime
-            from app.services.firebase_db import firebase_db
+            from datetime import datetime, timezone
             from app.models import Message, ImageData
 
             msg = Message(
                 id=message_id,
                 user_id=user_id,
-                timestamp=datetime.utcnow(),
+                timestamp=datetime.now(timezone.utc),
                 role="ai",
                 type="image",
                 content=caption or "",
                 gcs_path=image_url,
             )
-            firebase_db.add_message(user_id, msg)
+            self._log_outbound(user_id, msg)
 
         return message_id
 
@@ -138,47 +151,68 @@ class WhatsAppClient:  # pylint: disable=too-few-public-methods
         message_id = await self._post_message(payload)
 
         if log_to_firebase and user_id:
-            from datetime import datetime
-            from app.services.firebase_db import firebase_db
+            from datetime import datetime, timezone
             from app.models import Message
 
             msg = Message(
                 id=message_id,
                 user_id=user_id,
-                timestamp=datetime.utcnow(),
+                timestamp=datetime.now(timezone.utc),
                 role="ai",
                 type="text",
                 content=f"(template:{template_name})",
             )
-            firebase_db.add_message(user_id, msg)
+            self._log_outbound(user_id, msg)
 
         return message_id
 
     async def download_media(self, media_id: str) -> tuple[bytes, str]:
         """Download media bytes and return (bytes, content_type)."""
 
-        # Step 1: fetch media metadata to obtain the URL
-        meta_url = f"{self._base_url}/{media_id}"
-        logger.debug("GET %s", meta_url)
-        meta_resp = await self._client.get(meta_url, params={"fields": "url"})
-        if meta_resp.status_code >= 400:
-            raise WhatsAppAPIError(meta_resp.status_code, meta_resp.text)
-        meta_json = meta_resp.json()
-        download_url = meta_json.get("url")
-        if not download_url:
-            raise WhatsAppAPIError(meta_resp.status_code, "Missing download URL in metadata")
-
-        # Step 2: download the binary
+        # Step 1: fetch media metadata to obtain the URL (unless recently resolved)
+        download_url = self._media_urls.get(media_id)
+        if download_url is None:
+            meta_url = f"{self._base_url}/{media_id}"
+            logger.debug("GET %s", meta_url)
+            meta_resp = await self._client.get(meta_url, params={"fields": "url"})
+            if meta_resp.status_code >= 400:
+                raise WhatsAppAPIError(meta_resp.status_code, meta_resp.text)
+            meta_json = meta_resp.json()
+            download_url = meta_json.get("url")
+            if not download_url:
+                raise WhatsAppAPIError(meta_resp.status_code, "Missing download URL in metadata")
+            self._media_urls[media_id] = download_url
+
+        # Step 2: stream the binary
         logger.debug("GET media %s", download_url)
-        bin_resp = await self._client.get(download_url)
-        if bin_resp.status_code >= 400:
-            raise WhatsAppAPIError(bin_resp.status_code, "Failed to download media")
-        return bin_resp.content, bin_resp.headers.get("Content-Type", "application/octet-stream")
+        async with self._client.stream("GET", download_url) as bin_resp:
+            if bin_resp.status_code >= 400:
+                self._media_urls.pop(media_id, None)
+                raise WhatsAppAPIError(bin_resp.status_code, "Failed to download media")
+            content_type = bin_resp.headers.get("Content-Type", "application/octet-stream")
+            chunks = [chunk async for chunk in bin_resp.aiter_bytes(self._DOWNLOAD_CHUNK)]
+        return b"".join(chunks), content_type
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _log_outbound(self, user_id: str, msg: Any) -> None:
+        """Persist an outbound message without delaying the caller."""
+        from app.services.firebase_db import firebase_db_async  # local import to avoid cycles
+
+        task = asyncio.create_task(firebase_db_async.add_message(user_id, msg))
+        # Keep a strong reference until done so the task is not garbage-collected
+        self._pending_logs.add(task)
+        task.add_done_callback(partial(self._on_log_done, msg.id))
+
+    def _on_log_done(self, message_id: str, task: asyncio.Task) -> None:
+        self._pending_logs.discard(task)
+        if task.cancelled():
+            logger.error("Outbound message %s was not persisted: log task cancelled", message_id)
+        elif task.exception() is not None:
+            logger.error("Failed to log outbound message %s: %s", message_id, task.exception())
+
     async def _post_message(self, payload: dict[str, Any]) -> str:
         url = f"{self._base_url}/{self._phone_id}/messages"
         logger.debug("POST %s -> %s", url, payload)
@@ -194,6 +228,9 @@ class WhatsAppClient:  # pylint: disable=too-few-public-methods
         return message_id
 
     async def close(self) -> None:
+        """Flush pending outbound-message logs, then close the HTTP client."""
+        if self._pending_logs:
+            await asyncio.gather(*self._pending_logs, return_exceptions=True)
         await self._client.aclose()
 
 